@@ -1,3 +1,4 @@
+mod simd;
 mod sparse_mat;
 
 use sparse_mat::*;
@@ -0,0 +1,105 @@
+/// Rows up to this length are searched with a single vector compare.
+pub const SHORT_ROW: usize = 8;
+
+/// Position of `n` in `row` (at most `SHORT_ROW` long), found without branching
+/// on the individual entries.
+pub fn find_short(row: &[u32], n: u32) -> Option<usize> {
+    debug_assert!(row.len() <= SHORT_ROW);
+
+    #[cfg(target_arch = "x86_64")]
+    let mask = if is_x86_feature_detected!("avx2") {
+        // SAFETY: avx2 support was checked just above
+        unsafe { eq_mask_avx2(row, n) }
+    } else {
+        eq_mask(row, n)
+    };
+    #[cfg(not(target_arch = "x86_64"))]
+    let mask = eq_mask(row, n);
+
+    (mask != 0).then(|| mask.trailing_zeros() as usize)
+}
+
+fn eq_mask(row: &[u32], n: u32) -> u32 {
+    row.iter()
+        .enumerate()
+        .fold(0, |mask, (i, &x)| mask | (u32::from(x == n) << i))
+}
+
+#[cfg(target_arch = "x86_64")]
+#[target_feature(enable = "avx2")]
+unsafe fn eq_mask_avx2(row: &[u32], n: u32) -> u32 {
+    use std::arch::x86_64::*;
+
+    let mut lanes = [0u32; SHORT_ROW];
+    lanes[..row.len()].copy_from_slice(row);
+
+    // SAFETY: `lanes` is exactly 256 bits wide
+    let lanes = unsafe { _mm256_loadu_si256(lanes.as_ptr().cast()) };
+    let eq = _mm256_cmpeq_epi32(lanes, _mm256_set1_epi32(n as i32));
+    // Padding lanes may compare equal to `n`, so mask them off
+    (_mm256_movemask_ps(_mm256_castsi256_ps(eq)) as u32) & ((1 << row.len()) - 1)
+}
+
+/// Whether every value in `xs` is `>= 0`.
+///
+/// ORs everything together and checks the sign bit once at the end; the loop
+/// has no branches, so it compiles down to wide vector ORs.
+pub fn all_non_negative(xs: &[i32]) -> bool {
+    xs.iter().fold(0, |acc, &x| acc | x) >= 0
+}
+
+/// Whether `xs` is non-decreasing.
+pub fn is_sorted(xs: &[u32]) -> bool {
+    is_sorted_dispatch::<false>(xs)
+}
+
+/// Whether `xs` is strictly increasing (sorted with no duplicates).
+pub fn is_strictly_sorted(xs: &[u32]) -> bool {
+    is_sorted_dispatch::<true>(xs)
+}
+
+fn is_sorted_dispatch<const STRICT: bool>(xs: &[u32]) -> bool {
+    #[cfg(target_arch = "x86_64")]
+    if xs.len() > SHORT_ROW && is_x86_feature_detected!("avx2") {
+        // SAFETY: avx2 support was checked just above
+        return unsafe { is_sorted_avx2::<STRICT>(xs) };
+    }
+    is_sorted_scalar::<STRICT>(xs)
+}
+
+fn is_sorted_scalar<const STRICT: bool>(xs: &[u32]) -> bool {
+    if STRICT {
+        xs.is_sorted_by(|a, b| a < b)
+    } else {
+        xs.is_sorted()
+    }
+}
+
+/// Compares `xs[i..i + 8]` against `xs[i + 1..i + 9]` lane-wise, leaving the
+/// final partial block to the scalar check.
+#[cfg(target_arch = "x86_64")]
+#[target_feature(enable = "avx2")]
+unsafe fn is_sorted_avx2<const STRICT: bool>(xs: &[u32]) -> bool {
+    use std::arch::x86_64::*;
+
+    let mut i = 0;
+    while i + SHORT_ROW < xs.len() {
+        // SAFETY: both loads stay within `xs[i..i + 9]`
+        let (prev, next) = unsafe {
+            (
+                _mm256_loadu_si256(xs.as_ptr().add(i).cast()),
+                _mm256_loadu_si256(xs.as_ptr().add(i + 1).cast()),
+            )
+        };
+        // There is no unsigned compare, but prev <= next iff max(prev, next) == next
+        let mut ok = _mm256_cmpeq_epi32(_mm256_max_epu32(prev, next), next);
+        if STRICT {
+            ok = _mm256_andnot_si256(_mm256_cmpeq_epi32(prev, next), ok);
+        }
+        if _mm256_movemask_ps(_mm256_castsi256_ps(ok)) != 0xFF {
+            return false;
+        }
+        i += SHORT_ROW;
+    }
+    is_sorted_scalar::<STRICT>(&xs[i..])
+}
@@ -1,95 +1,310 @@
-use pyo3::{exceptions::PyIndexError, prelude::*};
+use std::{ops::Range, sync::OnceLock};
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods, PyReadonlyArray1};
+use pyo3::{
+    exceptions::{PyIndexError, PyTypeError, PyValueError},
+    prelude::*,
+    types::PyTuple,
+};
+use rayon::prelude::*;
+use rustc_hash::FxHashMap;
+
+use crate::simd;
+
+/// Batches smaller than this are looked up serially, without releasing the GIL.
+const PAR_THRESHOLD: usize = 256;
+
+/// Bulk copies/scans touching fewer elements than this keep the GIL; below it,
+/// releasing and re-acquiring the GIL costs more than the work itself.
+const GIL_RELEASE_THRESHOLD: usize = 1 << 16;
 
 #[pyclass]
 #[derive(Default)]
 pub struct SprsMat {
-    pub row_ptr: Vec<usize>,
-    pub col_indx: Vec<usize>,
+    pub row_ptr: Vec<u32>,
+    pub col_indx: Vec<u32>,
     vals: Vec<f64>,
-    #[pyo3(get)]
     pub shape: (usize, usize),
+    index_cache: OnceLock<FxHashMap<u64, f64>>,
+    csc: OnceLock<CscView>,
+    format: Format,
+    /// First (up to) two entries of each row, kept inline for short rows
+    row_heads: Vec<RowHead>,
+    vals_py: OnceLock<Py<PyArray1<f64>>>,
+    shape_py: OnceLock<Py<PyTuple>>,
+}
+
+/// Storage pattern detected at construction, used to pick a lookup strategy.
+#[derive(Default, Clone, Copy, PartialEq, Eq)]
+enum Format {
+    #[default]
+    Csr,
+    /// Exactly one entry per row, stored at `(i, i)`
+    Diag,
+}
+
+/// Inline copy of a row's leading entries. Unused slots hold `u32::MAX`.
+#[derive(Clone, Copy)]
+struct RowHead {
+    cols: [u32; 2],
+    vals: [f64; 2],
+}
+
+/// Column-major view over the CSR buffers. Entries are referenced through
+/// `perm` (positions into `col_indx`/`vals`) rather than copying the values.
+#[derive(Default)]
+struct CscView {
+    col_ptr: Vec<u32>,
+    row_indx: Vec<u32>,
+    perm: Vec<u32>,
 }
 
 #[pymethods]
 impl SprsMat {
+    /// Builds a CSR matrix from `indptr`, `indices` and `data` buffers.
+    ///
+    /// Any 1-d array-like is accepted; contiguous NumPy arrays of the right
+    /// dtype are read in place instead of being converted element by element,
+    /// and strided views are copied once into contiguous buffers.
+    /// Indices are stored as `u32`, so `int32` arrays (scipy's default) are
+    /// read directly and other integer dtypes are narrowed with a range check.
+    /// Non-integer indices raise `TypeError` rather than being truncated.
     #[new]
-    pub fn new(
-        row_ptr: Vec<usize>,
-        col_indx: Vec<usize>,
-        vals: Vec<f64>,
+    pub fn new<'py>(
+        py: Python<'py>,
+        row_ptr: &Bound<'py, PyAny>,
+        col_indx: &Bound<'py, PyAny>,
+        vals: &Bound<'py, PyAny>,
         shape: (usize, usize),
-    ) -> Self {
-        SprsMat {
-            row_ptr,
-            col_indx,
-            vals,
-            shape,
+    ) -> PyResult<Self> {
+        let (row_ptr, col_indx) = (
+            IndexArray::extract(row_ptr, "row_ptr")?,
+            IndexArray::extract(col_indx, "col_indx")?,
+        );
+        let vals: PyReadonlyArray1<'py, f64> = py
+            .import("numpy")?
+            .call_method1("ascontiguousarray", (vals, "float64"))?
+            .extract()?;
+        let (row_ptr, col_indx, vals) =
+            (row_ptr.as_slice()?, col_indx.as_slice()?, vals.as_slice()?);
+
+        let build = || -> PyResult<Self> {
+            let row_ptr = row_ptr.to_u32("row_ptr")?;
+            let col_indx = col_indx.to_u32("col_indx")?;
+            let vals = vals.to_vec();
+            validate_csr(&row_ptr, &col_indx, &vals, shape)?;
+            Ok(SprsMat {
+                format: detect_format(&row_ptr, &col_indx, &vals),
+                row_heads: row_heads(&row_ptr, &col_indx, &vals),
+                row_ptr,
+                col_indx,
+                vals,
+                shape,
+                ..Default::default()
+            })
+        };
+        if row_ptr.len() + vals.len() < GIL_RELEASE_THRESHOLD {
+            build()
+        } else {
+            py.detach(build)
         }
     }
 
     #[staticmethod]
     pub fn zeros(m: usize, n: usize) -> Self {
+        let row_ptr = vec![0; m + 1];
         SprsMat {
             shape: (m, n),
-            row_ptr: vec![0; m + 1],
+            row_heads: row_heads(&row_ptr, &[], &[]),
+            row_ptr,
             ..Default::default()
         }
     }
 
-    pub fn vals(&self) -> Vec<f64> {
+    /// The `(rows, cols)` tuple is created once and shared by later accesses.
+    #[getter(shape)]
+    fn py_shape<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyTuple>> {
+        if let Some(shape) = self.shape_py.get() {
+            return Ok(shape.bind(py).clone());
+        }
+
+        let shape = PyTuple::new(py, [self.shape.0, self.shape.1])?;
+        Ok(self
+            .shape_py
+            .get_or_init(|| shape.unbind())
+            .bind(py)
+            .clone())
+    }
+
+    /// Returns the stored values as a read-only NumPy array.
+    ///
+    /// The array is built on first access and shared by later calls until the
+    /// matrix is modified.
+    pub fn vals<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray1<f64>>> {
+        if let Some(vals) = self.vals_py.get() {
+            return Ok(vals.bind(py).clone());
+        }
+
+        let vals = PyArray1::from_slice(py, &self.vals);
+        vals.getattr("flags")?.setattr("writeable", false)?;
+        Ok(self.vals_py.get_or_init(|| vals.unbind()).bind(py).clone())
+    }
+
+    /// Returns the stored values as a Python list.
+    pub fn vals_list(&self) -> Vec<f64> {
         self.vals.clone()
     }
 
+    /// Precomputes a hash index of the stored entries so that subsequent
+    /// lookups are a single hash probe instead of a search through the row.
+    pub fn build_index(&self) {
+        self.index_cache.get_or_init(|| {
+            let mut index = FxHashMap::default();
+            index.reserve(self.vals.len());
+            for m in 0..self.shape.0 {
+                for k in self.row_range(m) {
+                    index.insert(index_key(m, self.col_indx[k]), self.vals[k]);
+                }
+            }
+            index
+        });
+    }
+
+    /// Returns the row indices (as `int64`, so arithmetic on them cannot wrap)
+    /// and values stored in column `n`.
+    pub fn col<'py>(
+        &self,
+        py: Python<'py>,
+        n: i64,
+    ) -> PyResult<(Bound<'py, PyArray1<i64>>, Bound<'py, PyArray1<f64>>)> {
+        let n = usize::try_from(n)
+            .ok()
+            .filter(|&n| n < self.shape.1)
+            .ok_or_else(|| {
+                PyIndexError::new_err(format!(
+                    "Column {} out of bounds for matrix of shape {:?}",
+                    n, self.shape
+                ))
+            })?;
+
+        let csc = self.ensure_csc();
+        let (start, end) = (csc.col_ptr[n] as usize, csc.col_ptr[n + 1] as usize);
+        Ok((
+            PyArray1::from_iter(py, csc.row_indx[start..end].iter().map(|&m| i64::from(m))),
+            PyArray1::from_iter(
+                py,
+                csc.perm[start..end].iter().map(|&k| self.vals[k as usize]),
+            ),
+        ))
+    }
+
+    /// Returns the matrix as a dense, row-major NumPy array.
+    pub fn todense<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<f64>>> {
+        // Let NumPy allocate, so an oversized shape raises MemoryError/ValueError
+        // instead of overflowing or aborting on a failed allocation
+        let dense: Bound<'py, PyArray2<f64>> = py
+            .import("numpy")?
+            .call_method1("zeros", ((self.shape.0, self.shape.1),))?
+            .extract()?;
+        {
+            let mut dense = dense.readwrite();
+            let data = dense.as_slice_mut()?;
+            if data.len() < GIL_RELEASE_THRESHOLD {
+                self.scatter_dense(data);
+            } else {
+                py.detach(|| self.scatter_dense(data));
+            }
+        }
+        Ok(dense)
+    }
+
+    #[pyo3(signature = (dtype=None, copy=None))]
+    fn __array__<'py>(
+        &self,
+        py: Python<'py>,
+        dtype: Option<&Bound<'py, PyAny>>,
+        copy: Option<bool>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        if copy == Some(false) {
+            return Err(PyValueError::new_err(
+                "SprsMat cannot be converted to an array without a copy",
+            ));
+        }
+
+        let dense = self.todense(py)?.into_any();
+        match dtype {
+            Some(dtype) => dense.call_method1("astype", (dtype,)),
+            None => Ok(dense),
+        }
+    }
+
     fn __getitem__(&self, idx: [i32; 2]) -> PyResult<f64> {
-        let [m, n] = idx;
-        let m =
-            usize::try_from(m).map_err(|_| PyIndexError::new_err("index m cannot be negative"))?;
-        let n =
-            usize::try_from(n).map_err(|_| PyIndexError::new_err("index n cannot be negative"))?;
+        let (m, n) = self.checked_index(idx[0].into(), idx[1].into())?;
+        Ok(self.get(m, n))
+    }
 
-        if self.shape.0 <= m || self.shape.1 <= n {
-            return Err(PyIndexError::new_err(format!(
-                "Index {:?} out of bounds for  matrix of shape {:?}",
-                idx, self.shape
+    /// Looks up every `(rows[i], cols[i])` pair in a single call.
+    pub fn getitems<'py>(
+        &self,
+        py: Python<'py>,
+        rows: &Bound<'py, PyAny>,
+        cols: &Bound<'py, PyAny>,
+    ) -> PyResult<Bound<'py, PyArray1<f64>>> {
+        let (rows, cols) = (i64_array(rows, "rows")?, i64_array(cols, "cols")?);
+        let (rows, cols) = (rows.as_slice()?, cols.as_slice()?);
+        if rows.len() != cols.len() {
+            return Err(PyValueError::new_err(format!(
+                "rows and cols must have the same length, got {} and {}",
+                rows.len(),
+                cols.len()
             )));
+        }
+
+        let mut out = vec![0.0; rows.len()];
+        let lookup = |(out, (&m, &n)): (&mut f64, (&i64, &i64))| -> PyResult<()> {
+            let (m, n) = self.checked_index(m, n)?;
+            *out = self.get(m, n);
+            Ok(())
         };
-        Ok(
-            match self.col_indx[self.row_ptr[m]..self.row_ptr[m + 1]]
-                .iter()
-                .position(|x| x == &n)
-            {
-                Some(i) => self.vals[self.row_ptr[m] + i],
-                None => 0.0,
-            },
-        )
+        if rows.len() < PAR_THRESHOLD {
+            out.iter_mut()
+                .zip(rows.iter().zip(cols))
+                .try_for_each(lookup)?;
+        } else {
+            py.detach(|| {
+                out.par_iter_mut()
+                    .zip(rows.par_iter().zip(cols))
+                    .try_for_each(lookup)
+            })?;
+        }
+        Ok(PyArray1::from_vec(py, out))
     }
 
     // Todo
     fn __setitem__(&mut self, idx: [i32; 2], value: f64) -> PyResult<()> {
-        let [m, n] = idx;
-        let m =
-            usize::try_from(m).map_err(|_| PyIndexError::new_err("index m cannot be negative"))?;
-        let n =
-            usize::try_from(n).map_err(|_| PyIndexError::new_err("index n cannot be negative"))?;
+        let (m, n) = self.checked_index(idx[0].into(), idx[1].into())?;
 
-        if self.shape.0 <= m || self.shape.1 <= n {
-            return Err(PyIndexError::new_err(format!(
-                "Index {:?} out of bounds for  matrix of shape {:?}",
-                idx, self.shape
-            )));
-        };
-
-        match self.col_indx[self.row_ptr[m]..self.row_ptr[m + 1]]
+        let row = self.row_range(m);
+        match self.col_indx[row.clone()]
             .iter()
-            .rposition(|x| x <= &n)
+            .rposition(|&x| x as usize <= n)
         {
             Some(rel_indx) => {
-                if self.col_indx[self.row_ptr[m] + rel_indx] == n {
-                    self.vals[self.row_ptr[m] + rel_indx] = value;
+                if self.col_indx[row.start + rel_indx] as usize == n {
+                    // Structure is unchanged: the CSC view stores positions
+                    // and the format depends only on the indices
+                    self.vals[row.start + rel_indx] = value;
+                    if let Some(head) = self.row_heads[m].vals.get_mut(rel_indx) {
+                        *head = value;
+                    }
                 } else {
-                    self.vals.insert(self.row_ptr[m] + rel_indx, value);
-                    self.row_ptr.insert(self.row_ptr[m] + rel_indx, n);
+                    self.vals.insert(row.start + rel_indx, value);
+                    self.row_ptr.insert(row.start + rel_indx, n as u32);
                     self.col_indx.iter_mut().for_each(|x| *x += 1);
+
+                    self.csc.take();
+                    self.format = detect_format(&self.row_ptr, &self.col_indx, &self.vals);
+                    self.row_heads = row_heads(&self.row_ptr, &self.col_indx, &self.vals);
                 }
             }
             None => {
@@ -97,6 +312,11 @@ impl SprsMat {
             }
         };
 
+        if let Some(index) = self.index_cache.get_mut() {
+            index.insert(index_key(m, n as u32), value);
+        }
+        self.vals_py.take();
+
         Ok(())
     }
 
@@ -104,13 +324,18 @@ impl SprsMat {
         let mut mat_vec = Vec::new();
         for i in 0..self.shape.0 {
             mat_vec.push(String::new());
+            let row = self.row_range(i);
             let mut col_indx = 0;
             for j in 0..self.shape.1 {
-                if self.col_indx[self.row_ptr[i]..self.row_ptr[i + 1]].get(col_indx) == Some(&j) {
+                if self.col_indx[row.clone()]
+                    .get(col_indx)
+                    .map(|&x| x as usize)
+                    == Some(j)
+                {
                     mat_vec
                         .last_mut()
                         .unwrap()
-                        .push_str(&self.vals[self.row_ptr[i] + col_indx].to_string());
+                        .push_str(&self.vals[row.start + col_indx].to_string());
                     col_indx += 1;
                 } else {
                     mat_vec.last_mut().unwrap().push_str("0");
@@ -125,3 +350,276 @@ impl SprsMat {
         mat_vec.join("\n")
     }
 }
+
+impl SprsMat {
+    fn row_range(&self, m: usize) -> Range<usize> {
+        self.row_ptr[m] as usize..self.row_ptr[m + 1] as usize
+    }
+
+    /// Writes the stored entries into a zeroed, row-major `nrows * ncols` buffer.
+    fn scatter_dense(&self, dense: &mut [f64]) {
+        let ncols = self.shape.1;
+        for m in 0..self.shape.0 {
+            let row = &mut dense[m * ncols..(m + 1) * ncols];
+            for k in self.row_range(m) {
+                row[self.col_indx[k] as usize] = self.vals[k];
+            }
+        }
+    }
+
+    fn checked_index(&self, m: i64, n: i64) -> PyResult<(usize, usize)> {
+        let idx = [m, n];
+        let m =
+            usize::try_from(m).map_err(|_| PyIndexError::new_err("index m cannot be negative"))?;
+        let n =
+            usize::try_from(n).map_err(|_| PyIndexError::new_err("index n cannot be negative"))?;
+
+        if self.shape.0 <= m || self.shape.1 <= n {
+            return Err(PyIndexError::new_err(format!(
+                "Index {:?} out of bounds for  matrix of shape {:?}",
+                idx, self.shape
+            )));
+        };
+        Ok((m, n))
+    }
+
+    /// Bucket-sorts the CSR entries by column on first use, in O(nnz + ncols).
+    fn ensure_csc(&self) -> &CscView {
+        self.csc.get_or_init(|| {
+            let nnz = self.col_indx.len();
+            let mut col_ptr = vec![0u32; self.shape.1 + 1];
+            for &n in &self.col_indx {
+                col_ptr[n as usize + 1] += 1;
+            }
+            for n in 0..self.shape.1 {
+                col_ptr[n + 1] += col_ptr[n];
+            }
+
+            let mut next = col_ptr.clone();
+            let mut row_indx = vec![0u32; nnz];
+            let mut perm = vec![0u32; nnz];
+            for m in 0..self.shape.0 {
+                for k in self.row_range(m) {
+                    let dst = &mut next[self.col_indx[k] as usize];
+                    row_indx[*dst as usize] = m as u32;
+                    perm[*dst as usize] = k as u32;
+                    *dst += 1;
+                }
+            }
+
+            CscView {
+                col_ptr,
+                row_indx,
+                perm,
+            }
+        })
+    }
+
+    fn get(&self, m: usize, n: usize) -> f64 {
+        if let Format::Diag = self.format {
+            return if m == n { self.vals[m] } else { 0.0 };
+        }
+        // Columns past u32::MAX can never be stored (and would alias the
+        // next row in the index key)
+        let Ok(n) = u32::try_from(n) else {
+            return 0.0;
+        };
+        if let Some(index) = self.index_cache.get() {
+            return index.get(&index_key(m, n)).copied().unwrap_or(0.0);
+        }
+        let row = self.row_range(m);
+        if row.len() <= 2 {
+            let head = &self.row_heads[m];
+            return match head.cols[..row.len()].iter().position(|&x| x == n) {
+                Some(i) => head.vals[i],
+                None => 0.0,
+            };
+        }
+
+        let cols = &self.col_indx[row.clone()];
+        let hit = if cols.len() <= simd::SHORT_ROW {
+            simd::find_short(cols, n)
+        } else {
+            cols.binary_search(&n).ok()
+        };
+        match hit {
+            Some(i) => self.vals[row.start + i],
+            None => 0.0,
+        }
+    }
+}
+
+fn validate_csr(
+    row_ptr: &[u32],
+    col_indx: &[u32],
+    vals: &[f64],
+    shape: (usize, usize),
+) -> PyResult<()> {
+    if row_ptr.len() != shape.0 + 1 {
+        return Err(PyValueError::new_err(format!(
+            "row_ptr must have {} entries for a matrix of shape {:?}, got {}",
+            shape.0 + 1,
+            shape,
+            row_ptr.len()
+        )));
+    }
+    if col_indx.len() != vals.len() {
+        return Err(PyValueError::new_err(format!(
+            "col_indx and vals must have the same length, got {} and {}",
+            col_indx.len(),
+            vals.len()
+        )));
+    }
+    if row_ptr[0] != 0 || row_ptr[shape.0] as usize != col_indx.len() {
+        return Err(PyValueError::new_err(format!(
+            "row_ptr must run from 0 to {}",
+            col_indx.len()
+        )));
+    }
+    if !simd::is_sorted(row_ptr) {
+        return Err(PyValueError::new_err("row_ptr must be non-decreasing"));
+    }
+
+    for m in 0..shape.0 {
+        let cols = &col_indx[row_ptr[m] as usize..row_ptr[m + 1] as usize];
+        if !simd::is_strictly_sorted(cols) {
+            return Err(PyValueError::new_err(format!(
+                "col_indx of row {m} must be sorted without duplicates"
+            )));
+        }
+        if let Some(&n) = cols.last().filter(|&&n| n as usize >= shape.1) {
+            return Err(PyValueError::new_err(format!(
+                "Column {} out of bounds for matrix of shape {:?}",
+                n, shape
+            )));
+        }
+    }
+    Ok(())
+}
+
+fn row_heads(row_ptr: &[u32], col_indx: &[u32], vals: &[f64]) -> Vec<RowHead> {
+    row_ptr
+        .windows(2)
+        .map(|w| {
+            let mut head = RowHead {
+                cols: [u32::MAX; 2],
+                vals: [0.0; 2],
+            };
+            let (start, end) = (w[0] as usize, w[1] as usize);
+            for (i, k) in (start..end.min(start + 2)).enumerate() {
+                head.cols[i] = col_indx[k];
+                head.vals[i] = vals[k];
+            }
+            head
+        })
+        .collect()
+}
+
+fn detect_format(row_ptr: &[u32], col_indx: &[u32], vals: &[f64]) -> Format {
+    let is_diag = col_indx.len() == vals.len()
+        && row_ptr.len() == col_indx.len() + 1
+        && row_ptr.iter().enumerate().all(|(i, &k)| k as usize == i)
+        && col_indx.iter().enumerate().all(|(i, &n)| n as usize == i);
+
+    if is_diag { Format::Diag } else { Format::Csr }
+}
+
+fn index_key(m: usize, n: u32) -> u64 {
+    ((m as u64) << 32) | u64::from(n)
+}
+
+/// Converts any array-like into a C-contiguous integer ndarray, copying only
+/// if it is strided. Non-integer dtypes are rejected instead of truncated;
+/// empty input is let through whatever its dtype (`[]` is float64).
+fn integer_array<'py>(indices: &Bound<'py, PyAny>, name: &str) -> PyResult<Bound<'py, PyAny>> {
+    let indices = indices
+        .py()
+        .import("numpy")?
+        .call_method1("ascontiguousarray", (indices,))?;
+    let dtype = indices.getattr("dtype")?;
+    let kind: String = dtype.getattr("kind")?.extract()?;
+    let size: usize = indices.getattr("size")?.extract()?;
+    if size > 0 && kind != "i" && kind != "u" {
+        return Err(PyTypeError::new_err(format!(
+            "{name} must contain integers, got dtype {dtype}"
+        )));
+    }
+    Ok(indices)
+}
+
+/// Integer array-like as a contiguous `int64` array.
+fn i64_array<'py>(indices: &Bound<'py, PyAny>, name: &str) -> PyResult<PyReadonlyArray1<'py, i64>> {
+    as_i64(integer_array(indices, name)?)
+}
+
+/// Contiguous integer array as `int64`, without copying if it already is.
+fn as_i64<'py>(indices: Bound<'py, PyAny>) -> PyResult<PyReadonlyArray1<'py, i64>> {
+    indices
+        .py()
+        .import("numpy")?
+        .call_method1("asarray", (indices, "int64"))?
+        .extract()
+}
+
+/// Index buffer passed from Python, kept in whichever integer width it came in.
+enum IndexArray<'py> {
+    I32(PyReadonlyArray1<'py, i32>),
+    I64(PyReadonlyArray1<'py, i64>),
+}
+
+impl<'py> IndexArray<'py> {
+    fn extract(indices: &Bound<'py, PyAny>, name: &str) -> PyResult<Self> {
+        let indices = integer_array(indices, name)?;
+        if let Ok(indices) = indices.extract::<PyReadonlyArray1<'py, i32>>() {
+            return Ok(Self::I32(indices));
+        }
+        Ok(Self::I64(as_i64(indices)?))
+    }
+
+    fn as_slice(&self) -> PyResult<IndexSlice<'_>> {
+        Ok(match self {
+            Self::I32(indices) => IndexSlice::I32(indices.as_slice()?),
+            Self::I64(indices) => IndexSlice::I64(indices.as_slice()?),
+        })
+    }
+}
+
+/// Borrowed view of an `IndexArray` that can be used without the GIL.
+#[derive(Clone, Copy)]
+enum IndexSlice<'a> {
+    I32(&'a [i32]),
+    I64(&'a [i64]),
+}
+
+impl IndexSlice<'_> {
+    fn len(self) -> usize {
+        match self {
+            Self::I32(indices) => indices.len(),
+            Self::I64(indices) => indices.len(),
+        }
+    }
+
+    fn to_u32(self, name: &str) -> PyResult<Vec<u32>> {
+        match self {
+            Self::I32(indices) => {
+                if !simd::all_non_negative(indices) {
+                    return Err(index_range_error(name));
+                }
+                // SAFETY: i32 and u32 have the same size and alignment, and
+                // non-negative values have the same bit pattern in both
+                let indices: &[u32] =
+                    unsafe { std::slice::from_raw_parts(indices.as_ptr().cast(), indices.len()) };
+                Ok(indices.to_vec())
+            }
+            Self::I64(indices) => indices
+                .iter()
+                .map(|&i| u32::try_from(i))
+                .collect::<Result<_, _>>()
+                .map_err(|_| index_range_error(name)),
+        }
+    }
+}
+
+fn index_range_error(name: &str) -> PyErr {
+    PyValueError::new_err(format!("{name} must only contain indices in [0, 2**32)"))
+}
@@ -0,0 +1,76 @@
+"""
+Pure-Python reference implementation of SprsMat.
+
+The lookup kernels are compiled with Numba when it is installed, otherwise they
+run as plain Python. Used as a second backend for differential fuzzing.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    BACKEND = "numba"
+except ImportError:  # pragma: no cover
+    BACKEND = "python"
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+@njit(cache=True)
+def csr_getitem(row_ptr, col_indx, vals, r, c):
+    for k in range(row_ptr[r], row_ptr[r + 1]):
+        if col_indx[k] == c:
+            return vals[k]
+    return 0.0
+
+
+@njit(cache=True)
+def csr_getitems(row_ptr, col_indx, vals, rows, cols):
+    out = np.zeros(rows.shape[0], dtype=np.float64)
+    for i in range(rows.shape[0]):
+        out[i] = csr_getitem(row_ptr, col_indx, vals, rows[i], cols[i])
+    return out
+
+
+class SprsMatPy:
+    """CSR matrix with the same read API as the Rust SprsMat."""
+
+    def __init__(self, row_ptr, col_indx, vals, shape):
+        self.row_ptr = np.asarray(row_ptr, dtype=np.int64)
+        self.col_indx = np.asarray(col_indx, dtype=np.int64)
+        self._vals = np.asarray(vals, dtype=np.float64)
+        self.shape = tuple(shape)
+
+    def vals(self):
+        return self._vals
+
+    def vals_list(self):
+        return self._vals.tolist()
+
+    def _check_index(self, rows, cols):
+        if (
+            np.any(rows < 0)
+            or np.any(cols < 0)
+            or np.any(rows >= self.shape[0])
+            or np.any(cols >= self.shape[1])
+        ):
+            raise IndexError(f"Index out of bounds for matrix of shape {self.shape}")
+
+    def __getitem__(self, idx):
+        r, c = idx
+        self._check_index(np.asarray(r), np.asarray(c))
+        return csr_getitem(self.row_ptr, self.col_indx, self._vals, r, c)
+
+    def getitems(self, rows, cols):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        if rows.shape != cols.shape:
+            raise ValueError(
+                f"rows and cols must have the same length, got {len(rows)} and {len(cols)}"
+            )
+        self._check_index(rows, cols)
+        return csr_getitems(self.row_ptr, self.col_indx, self._vals, rows, cols)
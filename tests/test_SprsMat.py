@@ -1,8 +1,17 @@
 import numpy as np
 import pytest
 import scipy.sparse as sp
-from linalg_lib import SprsMat
-from pytest import approx
+
+SprsMat = pytest.importorskip("linalg_lib").SprsMat
+
+
+def _random_pair(rows, cols, density, seed=0):
+    """Builds a seeded random scipy CSR matrix and the SprsMat holding it."""
+    sp_mat = sp.random(
+        rows, cols, density=density, format="csr", dtype=np.float64, random_state=seed
+    )
+    return sp_mat, SprsMat(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape)
+
 
 # ==========================================
 # 1. Structural Edge Cases
@@ -17,7 +26,8 @@ def test_weird_shapes():
     # 0x0 Matrix
     mat = SprsMat.zeros(0, 0)
     assert mat.shape == (0, 0)
-    assert mat.vals() == []
+    assert mat.shape is mat.shape  # cached, not rebuilt per access
+    assert mat.vals_list() == []
     with pytest.raises(IndexError):
         _ = mat[(0, 0)]
 
@@ -25,6 +35,7 @@ def test_weird_shapes():
     mat = SprsMat.zeros(5, 0)
     assert mat.shape == (5, 0)
     assert len(mat.vals()) == 0
+    assert mat.todense().shape == (5, 0)
     with pytest.raises(IndexError):
         _ = mat[(0, 0)]
 
@@ -40,13 +51,16 @@ def test_boundary_access():
     Test the EXACT corners of the matrix.
     This catches 'off-by-one' errors in your bounds checking or row_ptr logic.
     """
+    # 10x10 with only the four corners set:
+    # [[1, 0, ..., 0, 2],
+    #  [0, 0, ..., 0, 0],
+    #  ...
+    #  [3, 0, ..., 0, 4]]
+    row_ptr = [0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 4]
+    col_indx = [0, 9, 0, 9]
+    vals = [1.0, 2.0, 3.0, 4.0]
 
-    coo = sp.coo_matrix(([1, 2, 3, 4], ([0, 0, 9, 9], [0, 9, 0, 9])), shape=(10, 10))
-    csr = coo.tocsr()
-
-    rust_mat = SprsMat(
-        csr.indptr.tolist(), csr.indices.tolist(), csr.data.tolist(), csr.shape
-    )
+    rust_mat = SprsMat(row_ptr, col_indx, vals, (10, 10))
 
     # 1. Top-Left
     assert rust_mat[(0, 0)] == 1.0
@@ -114,51 +128,98 @@ def test_floating_point_special_values():
 
 
 # ==========================================
-# 3. The "Fuzzer" (Stress Test)
+# 3. Lookup Paths
+# (the scipy fuzzer lives in test_fuzz.py)
 # ==========================================
 
 
-@pytest.mark.parametrize("iteration", range(20))
-def test_fuzz_compare_scipy(iteration):
+def test_diagonal_access():
     """
-    Generates 20 random matrices with:
-    - Random dimensions (1x1 to 100x100)
-    - Random densities (empty to full)
-    - Checks 100 random points per matrix
+    Purely diagonal matrices take a closed-form lookup path.
+    Includes a wide (non-square) diagonal to check the off-diagonal columns.
     """
-    # 1. Random Parameters
-    rows = np.random.randint(1, 50)
-    cols = np.random.randint(1, 50)
-    density = np.random.uniform(0, 1.0)  # 0% to 100% dense
-
-    # 2. Build Oracle (Scipy)
-    sp_mat = sp.random(rows, cols, density=density, format="csr", dtype=np.float64)
-
-    # 3. Build Candidate (Rust)
-    rust_mat = SprsMat(
-        sp_mat.indptr.tolist(),
-        sp_mat.indices.tolist(),
-        sp_mat.data.tolist(),
-        sp_mat.shape,
-    )
+    for rows, cols in [(10, 10), (3, 5)]:
+        sp_mat = sp.eye(rows, cols, format="csr") * 2.5
+        mat = SprsMat(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape)
+        dense = sp_mat.toarray()
 
-    # 4. Verify Metadata
-    assert rust_mat.shape == sp_mat.shape
-    assert len(rust_mat.vals()) == sp_mat.nnz
+        for r in range(rows):
+            for c in range(cols):
+                assert mat[(r, c)] == dense[r, c]
 
-    # 5. Verify Random Access (The Stress Test)
-    # Check 100 random coordinates
-    for _ in range(100):
-        r = np.random.randint(0, rows)
-        c = np.random.randint(0, cols)
 
-        expected = sp_mat[r, c]
-        actual = rust_mat[(r, c)]
+def test_getitems_large_batch():
+    """Batches above the parallel threshold must match scipy too."""
+    sp_mat, rust_mat = _random_pair(100, 100, 0.1)
+
+    rng = np.random.default_rng(1)
+    rs = rng.integers(0, 100, size=5000)
+    cs = rng.integers(0, 100, size=5000)
+
+    expected = sp_mat.toarray()[rs, cs]
+    assert rust_mat.getitems(rs, cs).tolist() == expected.tolist()
+
+
+def test_getitems_strided():
+    """Columns of a C-ordered (n, 2) coordinate array are strided views."""
+    dense = np.array([[1.0, 0.0, 2.0], [0.0, 3.0, 0.0]])
+    sp_mat = sp.csr_matrix(dense)
+    mat = SprsMat(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape)
+
+    coords = np.ascontiguousarray(np.argwhere(dense))
+    rs, cs = coords[:, 0], coords[:, 1]
+    assert not rs.flags.c_contiguous
 
-        # Use approx to ignore float diffs
-        assert actual == approx(expected), (
-            f"Failed iter {iteration}: Mismatch at ({r},{c}) in {rows}x{cols} mat"
-        )
+    assert mat.getitems(rs, cs).tolist() == dense[rs, cs].tolist()
+
+
+def test_indexed_access():
+    """
+    build_index() swaps the row search for a hash lookup.
+    Results must be identical to the unindexed matrix.
+    """
+    sp_mat, rust_mat = _random_pair(50, 50, 0.2)
+    rust_mat.build_index()
+    dense = sp_mat.toarray()
+
+    rng = np.random.default_rng(1)
+    for r, c in zip(rng.integers(0, 50, size=100), rng.integers(0, 50, size=100)):
+        assert rust_mat[(r, c)] == dense[r, c], f"Mismatch at ({r},{c})"
+
+    # Columns past u32::MAX can't be stored and must not alias the next row
+    wide = SprsMat([0, 0, 1], [0], [5.0], (2, 2**33))
+    wide.build_index()
+    assert wide.getitems([0], [2**32]).tolist() == [0.0]
+    assert wide.getitems([1], [0]).tolist() == [5.0]
+
+
+def test_column_access():
+    """col(c) should return the same rows/values scipy stores in CSC order."""
+    sp_mat, rust_mat = _random_pair(30, 20, 0.3)
+    csc = sp_mat.tocsc()
+
+    for c in range(20):
+        rows, vals = rust_mat.col(c)
+        start, end = csc.indptr[c], csc.indptr[c + 1]
+
+        assert rows.dtype.kind == "i"  # signed, so rows - 1 cannot wrap
+        assert rows.tolist() == csc.indices[start:end].tolist()
+        assert vals.tolist() == csc.data[start:end].tolist()
+
+    with pytest.raises(IndexError):
+        rust_mat.col(20)
+
+
+def test_strided_buffers():
+    """Non-contiguous views (slices, columns of 2-d arrays) are accepted."""
+    sp_mat, _ = _random_pair(20, 20, 0.3)
+    indptr = np.repeat(sp_mat.indptr.astype(np.int64), 2)[::2]
+    indices = np.repeat(sp_mat.indices, 2)[::2]  # strided int32
+    data = np.column_stack([sp_mat.data, np.zeros(sp_mat.nnz)])[:, 0]
+    assert not (indptr.flags.c_contiguous or data.flags.c_contiguous)
+
+    mat = SprsMat(indptr, indices, data, sp_mat.shape)
+    assert np.array_equal(mat.todense(), sp_mat.toarray())
 
 
 def test_full_matrix_access():
@@ -170,17 +231,51 @@ def test_full_matrix_access():
     dense = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]], dtype=float)
     sp_mat = sp.csr_matrix(dense)
 
-    mat = SprsMat(
-        sp_mat.indptr.tolist(),
-        sp_mat.indices.tolist(),
-        sp_mat.data.tolist(),
-        sp_mat.shape,
-    )
+    mat = SprsMat(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape)
 
     for r in range(3):
         for c in range(3):
             assert mat[(r, c)] == dense[r, c]
 
+    assert np.array_equal(mat.todense(), dense)
+    assert np.array_equal(np.asarray(mat), dense)
+
+
+@pytest.mark.parametrize("stored", [[2, 5, 7], [1, 2, 3, 5, 8, 9, 11, 14]])
+def test_short_row_search(stored):
+    """
+    Rows of 3 to 8 entries are searched with one vector compare over
+    zero-padded lanes; the padding must never match a query for column 0.
+    """
+    row_ptr = [0, 0, len(stored)]  # row 0 empty, row 1 holds the short row
+    vals = [float(10 + n) for n in stored]
+    mat = SprsMat(row_ptr, stored, vals, (2, 16))
+
+    for n, v in zip(stored, vals):
+        assert mat[(1, n)] == v
+    assert mat[(1, 4)] == 0.0  # missing column between stored ones
+    assert mat[(1, 15)] == 0.0  # missing column past the last one
+    assert mat[(1, 0)] == 0.0  # column 0 is not stored in this row
+
+
+def test_array_protocol():
+    """__array__ honours dtype and refuses copy=False (it always allocates)."""
+    sp_mat = sp.csr_matrix(np.array([[1.5, 0.0], [0.0, 2.5]]))
+    mat = SprsMat(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape)
+
+    as_f32 = np.asarray(mat, dtype=np.float32)
+    assert as_f32.dtype == np.float32
+    assert np.array_equal(as_f32, sp_mat.toarray().astype(np.float32))
+
+    with pytest.raises(ValueError):
+        mat.__array__(copy=False)
+
+
+def test_todense_too_large():
+    """A shape too big to materialise raises instead of crashing the process."""
+    with pytest.raises((MemoryError, ValueError)):
+        SprsMat.zeros(1, 2**62).todense()
+
 
 def test_setitem_existing_nonzero():
     """Test updating a value that is already in the CSR structure."""
@@ -192,6 +287,36 @@ def test_setitem_existing_nonzero():
     assert len(mat.vals()) == 1  # Should NOT have added a new element
 
 
+def test_setitem_existing_keeps_lookups_consistent():
+    """In-place updates must reach the inline row heads and the column view."""
+    # [[1, 2, 0],
+    #  [0, 3, 0],
+    #  [0, 0, 4]]  (not diagonal, so lookups read the row heads)
+    mat = SprsMat([0, 2, 3, 4], [0, 1, 1, 2], [1.0, 2.0, 3.0, 4.0], (3, 3))
+    _ = mat.col(1)  # build the CSC view first
+
+    mat[0, 1] = 20.0
+    mat[1, 1] = 30.0
+
+    assert mat[0, 1] == 20.0
+    assert mat[1, 1] == 30.0
+    assert mat.col(1)[1].tolist() == [20.0, 30.0]
+
+
+def test_vals_cached():
+    """vals() hands out one shared read-only array until the matrix changes."""
+    mat = SprsMat([0, 1], [0], [10.0], (1, 2))
+    vals = mat.vals()
+
+    assert mat.vals() is vals
+    with pytest.raises(ValueError):
+        vals[0] = 1.0
+
+    mat[0, 0] = 50.0
+    assert mat.vals() is not vals
+    assert mat.vals_list() == [50.0]
+
+
 def test_setitem_new_nonzero():
     """Test 'injecting' a value into a zero slot (requires shift)."""
     # Matrix: [[10.0, 0.0]] -> [[10.0, 20.0]]
@@ -200,7 +325,7 @@ def test_setitem_new_nonzero():
 
     assert mat[0, 1] == 20.0
     assert len(mat.vals()) == 2
-    assert mat.vals() == [10.0, 20.0]
+    assert mat.vals_list() == [10.0, 20.0]
 
 
 def test_setitem_first_and_last_rows():
@@ -219,7 +344,7 @@ def test_setitem_first_and_last_rows():
 
 
 # ==========================================
-# 2. Randomized Fuzzing with Scipy
+# 4. Randomized Fuzzing with Scipy
 # ==========================================
 
 
@@ -254,15 +379,87 @@ def test_fuzz_assignments(seed):
     # Final state check
     # Convert Scipy to CSR for a fair comparison of internal buffers
     scipy_csr = scipy_mat.tocsr()
-    assert rust_mat.vals() == pytest.approx(scipy_csr.data.tolist())
+    assert rust_mat.vals_list() == pytest.approx(scipy_csr.data.tolist())
     assert len(rust_mat.vals()) == scipy_csr.nnz
 
 
 # ==========================================
-# 3. Error Handling
+# 5. Error Handling
 # ==========================================
 
 
+def test_getitems_bounds_checking():
+    """Bulk lookups should fail the same way single lookups do."""
+    mat = SprsMat.zeros(2, 2)
+
+    with pytest.raises(IndexError):
+        mat.getitems([0, 2], [0, 0])
+
+    with pytest.raises(IndexError):
+        mat.getitems([0, 0], [0, -1])
+
+    with pytest.raises(ValueError):
+        mat.getitems([0, 1], [0])
+
+    # Floats are rejected rather than truncated, as with mat[0.7, 1.9]
+    with pytest.raises(TypeError):
+        mat.getitems([0.7], [1.9])
+
+
+def test_invalid_index_buffers():
+    """Indices are stored as u32, so anything outside that range is rejected."""
+    with pytest.raises(ValueError):
+        SprsMat([0, -1], [0], [1.0], (1, 1))
+
+    with pytest.raises(ValueError):
+        SprsMat(np.array([0, -1], dtype=np.int32), [0], [1.0], (1, 1))
+
+    with pytest.raises(ValueError):
+        SprsMat(np.array([0, 1], dtype=np.int64), [2**32], [1.0], (1, 1))
+
+    # Floats are rejected rather than truncated to [0, 1]
+    with pytest.raises(TypeError):
+        SprsMat([0, 1.5], [0], [1.0], (1, 1))
+
+
+@pytest.mark.parametrize(
+    "row_ptr, col_indx, vals, shape",
+    [
+        ([0, 1], [0], [1.0], (2, 2)),  # row_ptr too short for the shape
+        ([0, 2], [0], [1.0], (1, 2)),  # row_ptr does not end at nnz
+        ([0, 2, 1, 2], [0, 1], [1.0, 2.0], (3, 2)),  # row_ptr decreases
+        ([0, 2], [1, 0], [1.0, 2.0], (1, 2)),  # unsorted row
+        ([0, 2], [1, 1], [1.0, 2.0], (1, 2)),  # duplicate column
+        ([0, 1], [2], [1.0], (1, 2)),  # column out of bounds
+        ([0, 1], [0], [1.0, 2.0], (1, 2)),  # vals/col_indx length mismatch
+        # Long inputs (> 8 entries) take the vectorized checks; put the
+        # fault in the second 8-wide block so the vector compare catches it
+        (
+            [0, 20],
+            list(range(10)) + [11, 10] + list(range(12, 20)),
+            [1.0] * 20,
+            (1, 20),
+        ),  # unsorted long row
+        (
+            [0, 20],
+            list(range(10)) + [10, 10] + list(range(12, 20)),
+            [1.0] * 20,
+            (1, 20),
+        ),  # duplicate in long row
+        (
+            list(range(11)) + [12, 11] + list(range(13, 21)),
+            [0] * 20,
+            [1.0] * 20,
+            (20, 1),
+        ),  # long row_ptr decreases
+    ],
+)
+def test_invalid_csr(row_ptr, col_indx, vals, shape):
+    """Malformed CSR buffers are rejected at construction instead of panicking later."""
+    with pytest.raises(ValueError):
+        SprsMat(row_ptr, col_indx, vals, shape)
+
+
 def test_setitem_bounds_checking():
     """Ensure invalid indices raise IndexError and don't crash Rust."""
     mat = SprsMat.zeros(2, 2)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from _pyref import BACKEND, SprsMatPy
+
+try:
+    from linalg_lib import SprsMat
+except ImportError:
+    SprsMat = None
+
+# The reference backend always runs, so the fuzzer still has a target when the
+# Rust extension has not been built
+BACKENDS = [
+    pytest.param(
+        SprsMat,
+        id="rust",
+        marks=pytest.mark.skipif(SprsMat is None, reason="linalg_lib is not built"),
+    ),
+    pytest.param(SprsMatPy, id=BACKEND),
+]
+
+
+@pytest.fixture(scope="module", params=BACKENDS)
+def fuzz_matrices(request):
+    """
+    Builds the 20 random (scipy, candidate) pairs once per backend:
+    - Random dimensions (1x1 to 49x49)
+    - Random densities (empty to full)
+    Uses its own seed so every backend is fuzzed on the same matrices.
+    """
+    rng = np.random.default_rng(0)
+    out = []
+    for _ in range(20):
+        # 1. Random Parameters
+        rows, cols = rng.integers(1, 50, size=2)
+        density = rng.uniform(0, 1.0)  # 0% to 100% dense
+
+        # 2. Build Oracle (Scipy)
+        sp_mat = sp.random(
+            rows, cols, density=density, format="csr", dtype=np.float64, random_state=rng
+        )
+
+        # 3. Build Candidate (Rust or the Numba reference)
+        out.append(
+            (
+                sp_mat,
+                request.param(sp_mat.indptr, sp_mat.indices, sp_mat.data, sp_mat.shape),
+            )
+        )
+    return out
+
+
+@pytest.mark.parametrize("iteration", range(20))
+def test_fuzz_compare_scipy(iteration, fuzz_matrices):
+    """Checks 100 random points on each of the fuzzed matrices."""
+    sp_mat, rust_mat = fuzz_matrices[iteration]
+    rows, cols = sp_mat.shape
+
+    # 4. Verify Metadata
+    assert rust_mat.shape == sp_mat.shape
+    assert len(rust_mat.vals()) == sp_mat.nnz
+
+    # 5. Verify Random Access (The Stress Test)
+    # Check 100 random coordinates in a single call, seeded per iteration so
+    # each case reproduces on its own (e.g. under -k or xdist)
+    rng = np.random.default_rng(iteration)
+    rs = rng.integers(0, rows, size=100)
+    cs = rng.integers(0, cols, size=100)
+
+    expected = sp_mat.toarray()[rs, cs]
+    actual = rust_mat.getitems(rs, cs)
+
+    # Same tolerances as pytest.approx, but reports the first bad coordinate
+    bad = np.flatnonzero(~np.isclose(actual, expected, rtol=1e-6, atol=1e-12))
+    assert bad.size == 0, (
+        f"Failed iter {iteration}: Mismatch at ({rs[bad[0]]},{cs[bad[0]]}) "
+        f"in {rows}x{cols} mat"
+    )